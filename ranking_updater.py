@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 import requests
-from bs4 import BeautifulSoup
-import pdfplumber
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+import lxml.html
 from io import BytesIO
 import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import os
 import re
+import shutil
+from urllib.parse import urljoin
 
 # --- 設定値 ---
 BASE_URL = "http://www.poolplayers.jp"
@@ -15,6 +19,9 @@ STANDINGS_URL = f"{BASE_URL}/standings/"
 TARGET_DIVISION_NAME = "028 COLLEGE (TUE)"
 DIVISION_CODE = TARGET_DIVISION_NAME.split()[0]  # '028'
 JSON_FILENAME = 'ranking_data.json'
+JST = datetime.timezone(datetime.timedelta(hours=9))
+# 並行して行う取得の数（S/P/R型PDF + SLレポート）。接続プールの大きさもこれに合わせる
+MAX_CONCURRENT_FETCHES = 4
 
 # チーム名マッピング辞書（名簿PDFが取得できない場合のフォールバック用）
 TEAM_NAME_MAP = {
@@ -23,34 +30,69 @@ TEAM_NAME_MAP = {
     '9': 'Aizawanwan', '10': 'Ridge Flow', '11': 'Tamatorino Okina'
 }
 
+# HTTP通信は全てこのセッションを使い、同一ホストへの接続を使い回す
+SESSION = requests.Session()
+SESSION.headers.update({
+    'Accept-Encoding': 'gzip, deflate',
+    'User-Agent': 'jpa-ranking-updater/1.0 (+https://github.com/germanium324/jpa-ranking)',
+})
+# 接続先は poolplayers.jp と cue-sports.com の2ホスト。並行取得のスレッドがプール待ちにならないようにする
+_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_CONCURRENT_FETCHES, max_retries=Retry(total=3, backoff_factor=0.3))
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# 正規表現はモジュール読み込み時に一度だけコンパイルする
+# 個人成績PDFの一行形式: Name Member# SL Gender Team TMP TMW Points MatchPoints Points% Place
+PLAYER_RE = re.compile(r"^(?P<name>.+?)\s+(?P<member>\d+)\s+(?P<sl>\d+)\s+(?P<gender>\w+)\s+(?P<team>028\d+)\s+(?P<tmp>\d+)\s+(?P<tmore>\d+)\s+(?P<points>\d+)\s+(?P<avg>[0-9.]+)\s+(?P<rate>[0-9.]+)\s*%?")
+# スコアシートPDFの "Team #: 1 2 3 ..." の見出し（"Team #:" を優先し、なければ "Team #"）と "Total: 50 42 ..." 行
+TEAM_NUM_COLON_RE = re.compile(r'Team\s*#:')
+TEAM_NUM_RE = re.compile(r'Team\s*#')
+TOTAL_LINE_RE = re.compile(r'Total:([^\n]*)')
+# 名簿PDF: 3カラムのチーム見出し行 / 単一チーム見出し行 / 読み飛ばす行 / プレイヤー行の各カラム
+TEAM_HEADERS_RE = re.compile(r'(028\d{2})\s+([A-Za-z][^0-9]+?)(?=\s*028\d{2}|$)')
+SINGLE_TEAM_RE = re.compile(r'^(028\d{2})\s+(.+?)$')
+ROSTER_SKIP_RE = re.compile(r'^Host:|^SL\s+Number|^Page \d+|^N\s+SL\s+Number')
+PLAYER_BLOCK_RE = re.compile(r'N?\s*(\d+)\s+\*\s+(\d+)\s+([A-Za-z][\w\s,\.-]+?)(?=\s+N?\s*\d+\s+\*|$)')
+DIVISION_PDF_RE = re.compile(rf'{DIVISION_CODE}\d+\.pdf', re.IGNORECASE)
+ANY_TYPE_PDF_RE = re.compile(rf'[SRP]{DIVISION_CODE}\d+\.pdf', re.IGNORECASE)
+PDF_RE_CACHE = {}
+
+# ダウンロードしたPDFのキャッシュ検証用ヘッダー {url: {'etag': ..., 'last_modified': ...}}
+PDF_VALIDATORS = {}
+# 条件付きGETで 304 が返った（前回から変更がない）ことを示す
+NOT_MODIFIED = object()
+
+
+def _pdf_link_re(type_char):
+    """指定タイプのPDFファイル名（例: P028111925.pdf）にマッチする正規表現を返す。"""
+    pattern = PDF_RE_CACHE.get(type_char)
+    if pattern is None:
+        pattern = re.compile(rf'{type_char}{DIVISION_CODE}(\d+)\.pdf', re.IGNORECASE)
+        PDF_RE_CACHE[type_char] = pattern
+    return pattern
+
 # --- 1. 最新のPDF URLを特定 ---
-def _find_target_row(soup):
+def _find_target_row(tree):
     """028ディビジョンの行を特定する。まずディビジョン名の完全一致で探し、
-    見つからない場合はディビジョンコードを含むPDFリンクを持つ行をスキャンする。"""
-    # 1) 完全一致で検索
-    target_cell = soup.find(string=TARGET_DIVISION_NAME)
-    if target_cell:
-        row = target_cell.find_parent('tr')
-        if row:
-            return row
+    見つからない場合はディビジョンコードを含むPDFリンクを持つ行をスキャンする。
+    tree は lxml.html でパースしたスタンディングページ。"""
+    # 1) 完全一致で検索（テキストノードから最も近い<tr>をXPathで一度に引く）
+    rows = tree.xpath('//text()[. = $name]/ancestor::tr[1]', name=TARGET_DIVISION_NAME)
+    if rows:
+        return rows[0]
 
     # 2) 部分一致（ディビジョンコードを含むセルテキスト）で検索
-    for cell in soup.find_all(['td', 'th']):
-        if DIVISION_CODE in (cell.get_text() or ''):
-            row = cell.find_parent('tr')
-            if row:
-                # この行に028のPDFリンクがあるか確認
-                for a in row.find_all('a'):
-                    href = a.get('href', '')
-                    if re.search(rf'{DIVISION_CODE}\d+\.pdf', href, re.IGNORECASE):
-                        print("部分一致でディビジョン行を検出しました（フォールバック）")
-                        return row
+    for row in tree.xpath('//*[self::td or self::th][contains(., $code)]/ancestor::tr[1]', code=DIVISION_CODE):
+        # この行に028のPDFリンクがあるか確認
+        for href in row.xpath('.//a/@href'):
+            if DIVISION_PDF_RE.search(href):
+                print("部分一致でディビジョン行を検出しました（フォールバック）")
+                return row
 
     # 3) 全<tr>をスキャンして028のPDFリンクを持つ行を探す
-    for tr in soup.find_all('tr'):
-        for a in tr.find_all('a'):
-            href = a.get('href', '')
-            if re.search(rf'[SRP]{DIVISION_CODE}\d+\.pdf', href, re.IGNORECASE):
+    for tr in tree.xpath('//tr'):
+        for href in tr.xpath('.//a/@href'):
+            if ANY_TYPE_PDF_RE.search(href):
                 print("PDFリンクスキャンでディビジョン行を検出しました（フォールバック）")
                 return tr
 
@@ -70,158 +112,173 @@ def _parse_pdf_date_token(token):
         return None
 
 
-def find_latest_pdf_url(standings_url):
-    """スタンディングページを解析し、最新の028ディビジョンのスコアシートPDFのURLを特定する"""
-    print(f"スタンディングページを解析中: {standings_url}")
+def fetch_standings_page(standings_url):
+    """スタンディングページを取得し、HTMLのバイト列を返す。失敗時はNone。"""
+    print(f"スタンディングページを取得中: {standings_url}")
     try:
-        response = requests.get(standings_url)
+        response = SESSION.get(standings_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return response.content
+    except requests.exceptions.RequestException as e:
+        print(f"スタンディングページの取得に失敗しました: {e}")
+        return None
 
-        division_code = DIVISION_CODE
 
-        target_row = _find_target_row(soup)
-        if not target_row:
-            print(f"エラー: ディビジョン名 '{TARGET_DIVISION_NAME}' がページに見つかりません。")
-            return None
+def find_latest_pdf_url(row_hrefs):
+    """ディビジョン行のリンク一覧から、最新の028ディビジョンのスコアシートPDFのURLを特定する"""
+    latest = find_pdf_url_by_type(row_hrefs, type_char='S')
+    if latest:
+        print(f"最新の（Standings）PDF URLを特定しました: {latest}")
+        return latest
 
-        all_links_in_row = target_row.find_all('a')
+    # フォールバック: 行内の最初のPDFリンクを返す
+    for href in row_hrefs:
+        if not href:
+            continue
+        full_url = urljoin(STANDINGS_URL, href)
+        if full_url.lower().endswith('.pdf'):
+            print(f"フォールバックでPDF URLを特定しました: {full_url}")
+            return full_url
 
-        # S型PDFの候補を抽出し、ファイル名の数字部分で最新（最大）を選ぶ
-        candidates = []
-        for a in all_links_in_row:
-            href = a.get('href')
-            if not href:
-                continue
-            m = re.search(rf'S{division_code}(\d+)\.pdf', href, re.IGNORECASE)
-            if m:
-                token = m.group(1)
-                parsed_date = _parse_pdf_date_token(token)
-                url = href if href.startswith('http') else BASE_URL + href
-                candidates.append((parsed_date, token, url))
-
-        if candidates:
-            candidates.sort(key=lambda x: (x[0] is not None, x[0] or datetime.date.min, x[1]), reverse=True)
-            latest = candidates[0][2]
-            print(f"最新の（Standings）PDF URLを特定しました: {latest}")
-            return latest
-
-        # フォールバック: 行内の最初のPDFリンクを返す
-        for a in all_links_in_row:
-            href = a.get('href')
-            if not href:
-                continue
-            full_url = href if href.startswith('http') else BASE_URL + href
-            if full_url.lower().endswith('.pdf'):
-                print(f"フォールバックでPDF URLを特定しました: {full_url}")
-                return full_url
+    return None
 
-        return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"スタンディングページの取得に失敗しました: {e}")
+def find_pdf_url_by_type(row_hrefs, type_char='P'):
+    """指定タイプ（'P','S'など）のPDF URLを行内のリンク一覧から探し、最新（ファイル名の数字が最大）を返す。"""
+    pdf_re = _pdf_link_re(type_char)
+    # 指定タイプのPDFの候補を抽出
+    candidates = []
+    for href in row_hrefs:
+        if not href:
+            continue
+        # 例: /standings/028/P028111925.pdf
+        m = pdf_re.search(href)
+        if m:
+            token = m.group(1)
+            parsed_date = _parse_pdf_date_token(token)
+            url = urljoin(STANDINGS_URL, href)
+            candidates.append((parsed_date, token, url))
+    if not candidates:
         return None
+    # MMDDYYの日付で最新を選択（解析不可時はトークン文字列でフォールバック）
+    candidates.sort(key=lambda x: (x[0] is not None, x[0] or datetime.date.min, x[1]), reverse=True)
+    return candidates[0][2]
 
 
-def find_pdf_url_by_type(standings_url, type_char='P'):
-    """指定タイプ（'P','S'など）のPDF URLを同じ行から探し、最新（ファイル名の数字が最大）を返す。"""
-    try:
-        response = requests.get(standings_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        target_row = _find_target_row(soup)
-        if not target_row:
-            return None
-
-        all_links = target_row.find_all('a')
-        division_code = DIVISION_CODE
-        # 指定タイプのPDFの候補を抽出
-        candidates = []
-        for a in all_links:
-            href = a.get('href')
-            if not href:
-                continue
-            # 例: /standings/028/P028111925.pdf
-            m = re.search(rf'{type_char}{division_code}(\d+)\.pdf', href, re.IGNORECASE)
-            if m:
-                token = m.group(1)
-                parsed_date = _parse_pdf_date_token(token)
-                url = href if href.startswith('http') else BASE_URL + href
-                candidates.append((parsed_date, token, url))
-        if not candidates:
-            return None
-        # MMDDYYの日付で最新を選択（解析不可時はトークン文字列でフォールバック）
-        candidates.sort(key=lambda x: (x[0] is not None, x[0] or datetime.date.min, x[1]), reverse=True)
-        return candidates[0][2]
-    except requests.exceptions.RequestException:
-        return None
+def _get_links_for_division(tree):
+    """028ディビジョンの行にあるリンクのhref一覧を返す。行が見つからなければ空リスト。"""
+    target_row = _find_target_row(tree)
+    if target_row is None:
+        print(f"エラー: ディビジョン名 '{TARGET_DIVISION_NAME}' がページに見つかりません。")
+        return []
+    return target_row.xpath('.//a/@href')
+
+
+def fetch_division_links(standings_url):
+    """スタンディングページを一度だけ取得・解析し、028ディビジョンの各タイプの最新PDF URLを返す。
+    戻り値: {'S': スコアシート, 'P': 個人成績, 'R': 名簿}（見つからないものは None）
+    """
+    links = dict.fromkeys(('S', 'P', 'R'))
+    standings_html = fetch_standings_page(standings_url)
+    if not standings_html:
+        return links
+
+    # BeautifulSoupの木は作らず、lxmlのXPathで直接ディビジョン行を探す
+    row_hrefs = _get_links_for_division(lxml.html.fromstring(standings_html))
+    links['S'] = find_latest_pdf_url(row_hrefs)
+    links['P'] = find_pdf_url_by_type(row_hrefs, type_char='P')
+    links['R'] = find_pdf_url_by_type(row_hrefs, type_char='R')
+    return links
 
 # --- 2. PDFファイルのダウンロード ---
-def download_pdf(url):
-    """指定されたURLからPDFファイルをダウンロードする"""
+def download_pdf(url, etag=None, last_modified=None):
+    """指定されたURLからPDFファイルをダウンロードする。
+    etag / last_modified を渡すと条件付きGETを行い、変更がなければ NOT_MODIFIED を返す。
+    取得したPDFの ETag / Last-Modified は PDF_VALIDATORS[url] に記録する。
+    """
     print(f"PDFをダウンロード中: {url}")
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return BytesIO(response.content)
-    except requests.exceptions.RequestException as e:
+        # 本文を一度bytesに溜めてからコピーしないよう、受信したチャンクを直接バッファに書き込む
+        with SESSION.get(url, headers=headers, stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                print(f"PDFは前回から更新されていません: {url}")
+                return NOT_MODIFIED
+            response.raise_for_status()
+            PDF_VALIDATORS[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            # gzip等で圧縮されていても展開された本文が読めるよう raw 側で復号させる
+            response.raw.decode_content = True
+            buf = BytesIO()
+            shutil.copyfileobj(response.raw, buf, length=64 * 1024)
+        buf.seek(0)
+        return buf
+    # raw を直接読むため、通信途中のエラーは requests ではなく urllib3 の例外のまま上がってくる
+    except (requests.exceptions.RequestException, Urllib3HTTPError) as e:
         print(f"PDFのダウンロードに失敗しました: {e}")
         return None
 
 # --- 3. PDFからのデータ抽出と整形 ---
+def _iter_pdf_pages(pdf_file):
+    """PDFの各ページのテキストを先頭から順に返すジェネレータ。各抽出関数はこれを共有する。"""
+    import pymupdf  # PyMuPDF は重いため、PDFを解析する時だけ読み込む
+
+    with pymupdf.open(stream=pdf_file.getvalue(), filetype="pdf") as doc:
+        for page in doc:
+            # sort=True で同じ高さのテキストを1行にまとめる（pdfplumber の extract_text と同様に表の行単位で返す）
+            yield page.get_text("text", sort=True) or ''
+
+
 def extract_and_process_ranking(pdf_file):
-    """PDFからランキングデータを抽出し、整形する"""
+    """PDFからランキングデータを抽出し、整形する。
+    戻り値: 総合ポイントの高い順に並べた [{'team_id', 'points'}]
+    """
     if pdf_file is None:
         return None
 
     ranking_data = {}
 
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ''
-
-            # Division Standings のポイントの行を特定する
-            if "Total:" in text:
-                team_num_line_start = text.find("Team #:")
-                # 一部のPDFでは "Team #:" だったり "Team #:" の表記揺れがあるため両方を試す
-                if team_num_line_start == -1:
-                    team_num_line_start = text.find("Team #")
-
-                total_points_line_start = text.find("Total:")
-
-                if team_num_line_start != -1 and total_points_line_start != -1:
-                    total_points_line = text[total_points_line_start :].split('\n')[0].strip()
-                    team_num_line = text[team_num_line_start : total_points_line_start].split('\n')[0].strip()
-
-                    # チーム番号とポイントを抽出
-                    # Team #: 1 2 3 ... のような並びを想定
-                    if 'Team #' in team_num_line:
-                        valid_team_nums = [num for num in team_num_line.split('Team #')[-1].replace(':','').strip().split() if num.isdigit()]
-                    else:
-                        valid_team_nums = [num for num in team_num_line.split() if num.isdigit()]
-
-                    points = total_points_line.split('Total:')[-1].strip().split()
-
-                    if len(valid_team_nums) == len(points) and len(valid_team_nums) > 0:
-                        for team_id, point in zip(valid_team_nums, points):
-                            if team_id not in ranking_data:
-                                try:
-                                    ranking_data[team_id] = int(point)
-                                except ValueError:
-                                    # 整数に変換できない場合はスキップ
-                                    continue
-
-    # 抽出したデータをDataFrameに変換
-    if not ranking_data:
-        return pd.DataFrame(columns=['team_id', 'points'])
-
-    df = pd.DataFrame(list(ranking_data.items()), columns=['team_id', 'points'])
+    for text in _iter_pdf_pages(pdf_file):
+        # Division Standings のポイント行とチーム番号の見出しを特定する
+        total = TOTAL_LINE_RE.search(text)
+        if not total:
+            continue
+        team = TEAM_NUM_COLON_RE.search(text) or TEAM_NUM_RE.search(text)
+        if not team:
+            continue
+        # チーム番号は見出しから "Total:" の手前まで（同じ行に続く場合もある）の1行分
+        team_nums_str = text[team.end():total.start()].split('\n', 1)[0]
+        points_str = total.group(1)
+
+        # チーム番号とポイントを抽出
+        # Team #: 1 2 3 ... のような並びを想定
+        valid_team_nums = [num for num in team_nums_str.replace(':', '').split() if num.isdigit()]
+        points = points_str.split()
+
+        if len(valid_team_nums) == len(points) and len(valid_team_nums) > 0:
+            for team_id, point in zip(valid_team_nums, points):
+                if team_id in ranking_data:
+                    continue
+                # 整数に変換できない場合はスキップ（既に取得済みのチームは変換自体を行わない）
+                try:
+                    ranking_data[team_id] = int(point)
+                except ValueError:
+                    continue
 
-    # 総合ポイントの高い順に並べ替える
-    df = df.sort_values(by='points', ascending=False)
+        # 順位表は最初の "Total:" ページにしかないため、取得できたら残りのページは読まない
+        if ranking_data:
+            break
 
-    return df
+    # 総合ポイントの高い順に並べ替える（十数チームなのでDataFrameは使わない）
+    items = list(ranking_data.items())
+    items.sort(key=lambda kv: -kv[1])
+    return [{'team_id': tid, 'points': pts} for tid, pts in items]
 
 
 def extract_individual_stats(pdf_file, team_name_map=None):
@@ -232,43 +289,49 @@ def extract_individual_stats(pdf_file, team_name_map=None):
     if pdf_file is None:
         return []
 
-    effective_map = team_name_map if team_name_map else TEAM_NAME_MAP
+    # ループ内で参照するグローバルはローカル変数に束縛しておく
+    team_map = TEAM_NAME_MAP
+    effective_map = team_name_map if team_name_map else team_map
+    match_player = PLAYER_RE.match
+
+    # 各行の値はまず m.group(...) の文字列のタプルのまま溜め、辞書はページを読み終えてから作る
+    rows = []
+
+    for text in _iter_pdf_pages(pdf_file):
+        found_before = len(rows)
+        # 空行を除いた各行をリストに溜めずに順に処理する
+        for ln in (stripped for stripped in map(str.strip, text.splitlines()) if stripped):
+            # 一行形式: Name Member# SL Gender Team TMP TMW Points MatchPoints Points% Place
+            # 例: Hayato Takenaka 16997 2 M 02810 6 5 84 14.00 70.0 % 1
+            # チームコード(028xx)を含まない行は正規表現にかけるまでもなく対象外
+            if DIVISION_CODE not in ln:
+                continue
+            m = match_player(ln)
+            if m:
+                rows.append(m.group('name', 'member', 'sl', 'gender', 'team', 'tmp', 'tmore', 'avg', 'rate'))
 
-    individuals = []
+        # 成績表のページが終わった（このページで1件も取れなかった）ら以降は読まない
+        if rows and len(rows) == found_before:
+            break
 
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ''
-            lines = [ln.strip() for ln in text.split('\n') if ln.strip()]
-            for ln in lines:
-                # 一行形式: Name Member# SL Gender Team TMP TMW Points MatchPoints Points% Place
-                # 例: Hayato Takenaka 16997 2 M 02810 6 5 84 14.00 70.0 % 1
-                m = re.match(r"^(?P<name>.+?)\s+(?P<member>\d+)\s+(?P<sl>\d+)\s+(?P<gender>\w+)\s+(?P<team>028\d+)\s+(?P<tmp>\d+)\s+(?P<tmore>\d+)\s+(?P<points>\d+)\s+(?P<avg>[0-9.]+)\s+(?P<rate>[0-9.]+)\s*%?", ln)
-                if m:
-                    team_code = m.group('team')
-                    # team_code は '02810' のようになっている -> team_id は '10'
-                    team_id = team_code.replace('028','').lstrip('0') or team_code[-2:]
-                    team_name = effective_map.get(team_id) or TEAM_NAME_MAP.get(team_id, f'チームNo.{team_id}')
-                    player_name = m.group('name')
-                    gender = m.group('gender')
-                    # 性別を日本語に変換
-                    gender_jp = '男' if gender.upper() == 'M' else '女' if gender.upper() == 'F' else gender
-                    sl = m.group('sl')
-                    tmp = m.group('tmp')
-                    tmore = m.group('tmore')
-                    avg = m.group('avg')
-                    rate = m.group('rate')
-
-                    individuals.append({
-                        'team_name': team_name,
-                        'player_name': player_name,
-                        'player_number': m.group('member'),
-                        'gender': gender_jp,
-                        'sl': int(sl),
-                        'wins': f"{tmore}/{tmp}",
-                        'avg_points': float(avg),
-                        'points_rate': f"{rate}%"
-                    })
+    individuals = []
+    for player_name, member, sl, gender, team_code, tmp, tmore, avg, rate in rows:
+        # team_code は '02810' のようになっている -> team_id は '10'（'02801' -> '1'）
+        team_id = str(int(team_code[len(DIVISION_CODE):]))
+        team_name = effective_map.get(team_id) or team_map.get(team_id, f'チームNo.{team_id}')
+        # 性別を日本語に変換
+        gender_jp = '男' if gender.upper() == 'M' else '女' if gender.upper() == 'F' else gender
+
+        individuals.append({
+            'team_name': team_name,
+            'player_name': player_name,
+            'player_number': member,
+            'gender': gender_jp,
+            'sl': int(sl),
+            'wins': f"{tmore}/{tmp}",
+            'avg_points': float(avg),
+            'points_rate': f"{rate}%"
+        })
 
     return individuals
 
@@ -282,70 +345,74 @@ def extract_team_roster(pdf_file):
 
     roster = []
 
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ''
-            lines = text.split('\n')
+    # 行ごとに呼ぶ正規表現のメソッドはローカル変数に束縛しておく
+    find_team_headers = TEAM_HEADERS_RE.finditer
+    match_single_team = SINGLE_TEAM_RE.match
+    match_skip_line = ROSTER_SKIP_RE.match
+    find_player_blocks = PLAYER_BLOCK_RE.finditer
+
+    for text in _iter_pdf_pages(pdf_file):
+        lines = text.splitlines()
+        
+        current_teams = {}  # {col_index: (team_code, team_name)}
+        
+        for ln in lines:
+            ln = ln.rstrip()
+            if not ln.strip():
+                continue
             
-            current_teams = {}  # {col_index: (team_code, team_name)}
+            # 3カラムレイアウトのチーム見出し行を検出
+            # 例: "02801 Kangaroo Kick 02802 Oku niki 02803 Wagamama foundry"
+            team_headers = list(find_team_headers(ln))
+            if len(team_headers) >= 2:  # 複数チームが並んでいる
+                current_teams = {}
+                for idx, match in enumerate(team_headers):
+                    team_code = match.group(1)
+                    team_name = match.group(2).strip()
+                    current_teams[idx] = (team_code, team_name)
+                continue
             
-            for ln in lines:
-                ln = ln.rstrip()
-                if not ln.strip():
-                    continue
-                
-                # 3カラムレイアウトのチーム見出し行を検出
-                # 例: "02801 Kangaroo Kick 02802 Oku niki 02803 Wagamama foundry"
-                team_headers = list(re.finditer(r'(028\d{2})\s+([A-Za-z][^0-9]+?)(?=\s*028\d{2}|$)', ln))
-                if len(team_headers) >= 2:  # 複数チームが並んでいる
-                    current_teams = {}
-                    for idx, match in enumerate(team_headers):
-                        team_code = match.group(1)
-                        team_name = match.group(2).strip()
-                        current_teams[idx] = (team_code, team_name)
-                    continue
-                
-                # 単一チーム見出し行
-                single_team_match = re.match(r'^(028\d{2})\s+(.+?)$', ln)
-                if single_team_match and 'Host' not in ln:
-                    team_code = single_team_match.group(1)
-                    team_name = single_team_match.group(2).strip()
-                    current_teams = {0: (team_code, team_name)}
-                    continue
-                
-                # ホスト行やヘッダーはスキップ
-                if re.match(r'^Host:|^SL\s+Number|^Page \d+|^N\s+SL\s+Number', ln):
-                    continue
+            # 単一チーム見出し行
+            single_team_match = match_single_team(ln)
+            if single_team_match and 'Host' not in ln:
+                team_code = single_team_match.group(1)
+                team_name = single_team_match.group(2).strip()
+                current_teams = {0: (team_code, team_name)}
+                continue
+            
+            # ホスト行やヘッダーはスキップ
+            if match_skip_line(ln):
+                continue
+            
+            if not current_teams:
+                continue
+            
+            # 3カラムのプレイヤー行を抽出
+            # 各カラムは "N? SL * member_number Name" の形式 (Nは新規メンバーマーカー)
+            # 例: "N 5 * 15428 Murayama, Shotaro N 2 * 16770 Oku, Yuki N 5 * 15343 Iwano, Atsushi"
+            # 例: "6 * 15428 Murayama, Shotaro 2 * 16770 Oku, Yuki 5 * 15343 Iwano, Atsushi"
+            player_blocks = list(find_player_blocks(ln))
+            
+            for idx, block in enumerate(player_blocks):
+                if idx >= len(current_teams):
+                    break
                 
-                if not current_teams:
-                    continue
+                sl = int(block.group(1))
+                member = block.group(2)
+                name = block.group(3).strip()
                 
-                # 3カラムのプレイヤー行を抽出
-                # 各カラムは "N? SL * member_number Name" の形式 (Nは新規メンバーマーカー)
-                # 例: "N 5 * 15428 Murayama, Shotaro N 2 * 16770 Oku, Yuki N 5 * 15343 Iwano, Atsushi"
-                # 例: "6 * 15428 Murayama, Shotaro 2 * 16770 Oku, Yuki 5 * 15343 Iwano, Atsushi"
-                player_blocks = list(re.finditer(r'N?\s*(\d+)\s+\*\s+(\d+)\s+([A-Za-z][\w\s,\.-]+?)(?=\s+N?\s*\d+\s+\*|$)', ln))
+                team_code, team_name = current_teams[idx]
+                team_id = str(int(team_code[len(DIVISION_CODE):]))
                 
-                for idx, block in enumerate(player_blocks):
-                    if idx >= len(current_teams):
-                        break
-                    
-                    sl = int(block.group(1))
-                    member = block.group(2)
-                    name = block.group(3).strip()
-                    
-                    team_code, team_name = current_teams[idx]
-                    team_id = team_code.replace('028', '').lstrip('0') or team_code[-2:]
-                    
-                    roster.append({
-                        'team_id': team_id,
-                        'team_code': team_code,
-                        'team_name': team_name,
-                        'player_name': name,
-                        'player_number': member,
-                        'gender': '-',
-                        'sl': sl
-                    })
+                roster.append({
+                    'team_id': team_id,
+                    'team_code': team_code,
+                    'team_name': team_name,
+                    'player_name': name,
+                    'player_number': member,
+                    'gender': '-',
+                    'sl': sl
+                })
 
     return roster
 
@@ -353,15 +420,15 @@ def extract_team_roster(pdf_file):
 def group_roster_by_team(roster_entries):
     grouped = {}
     for entry in roster_entries:
+        # team_id は extract_team_roster で文字列として作られている
         team_id = entry.get('team_id') or ''
-        team_key = str(team_id)
-        if team_key not in grouped:
-            grouped[team_key] = {
+        if team_id not in grouped:
+            grouped[team_id] = {
                 'team_id': team_id,
                 'team_name': entry.get('team_name', f'チームNo.{team_id}'),
                 'players': []
             }
-        grouped[team_key]['players'].append({
+        grouped[team_id]['players'].append({
             'player_name': entry['player_name'],
             'player_number': entry['player_number'],
             'gender': entry['gender'],
@@ -370,95 +437,133 @@ def group_roster_by_team(roster_entries):
     # チーム名でソート
     return sorted(grouped.values(), key=lambda t: t['team_name'])
 
+
+def ungroup_roster(roster_grouped):
+    """group_roster_by_team の逆変換。保存済みの名簿から名簿エントリのリストを復元する。
+    並びはPDFの順序ではなくチーム名順になる（表示側で個人成績は並べ替えられる）。
+    """
+    return [
+        {'team_id': team['team_id'], 'team_name': team['team_name'], **player}
+        for team in roster_grouped
+        for player in team['players']
+    ]
+
 # --- 5. SL変動情報の抽出 ---
-def extract_sl_changes():
-    """SLレポートページから028ディビジョンのSL変動情報を抽出"""
+def extract_sl_changes(known_members):
+    """SLレポートページから028ディビジョンのSL変動情報を抽出する。
+    known_members は028ディビジョンのメンバー番号の集合で、これに含まれるプレイヤーのみを返す。
+    レポートを取得・解析できなかった場合は、変動なし（空リスト）と区別するため None を返す。
+    """
+    if not known_members:
+        return []
+
     try:
         sl_report_url = "https://cue-sports.com/jpa/sl_report.php"
         print(f"SLレポートページを解析中: {sl_report_url}")
-        response = requests.get(sl_report_url, timeout=10)
+        response = SESSION.get(sl_report_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        from bs4 import BeautifulSoup, SoupStrainer  # SLレポートを解析する時だけ読み込む
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=SoupStrainer('table', class_='cp_table'))
         
         sl_changes = []
         
-        # 全ディビジョンのテーブルを探す（複数テーブルがある）
-        tables = soup.find_all('table', class_='cp_table')
-        
-        for table in tables:
-            rows = table.find_all('tr')[2:]  # ヘッダー行をスキップ
+        # 全ディビジョンのテーブル（複数ある）の行をCSSセレクタでまとめて取り出す。
+        # 見出し行は<td>が足りないかプレイヤーへのリンクを持たないため、下のチェックで読み飛ばされる
+        for row in soup.select('table.cp_table tr'):
+            tds = row.find_all('td', recursive=False)  # セルは<tr>の直下にしかない
+            if len(tds) < 5:
+                continue
             
-            for row in rows:
-                tds = row.find_all('td')
-                if len(tds) < 5:
+            try:
+                # テーブル構造: 名前, OLD日付, OLD SL, 矢印, NEW SL, NEW日付
+                player_link = tds[0].find('a')
+                if not player_link:
                     continue
                 
-                try:
-                    # テーブル構造: 名前, OLD日付, OLD SL, 矢印, NEW SL, NEW日付
-                    player_link = tds[0].find('a')
-                    if not player_link:
-                        continue
-                    
-                    player_name = player_link.get_text(strip=True)
-                    member_code = player_link.get('href', '').split('code=')[-1]
-                    
-                    old_date = tds[1].get_text(strip=True) if len(tds) > 1 else ''
-                    old_sl_text = tds[2].get_text(strip=True)
-                    new_sl_text = tds[4].get_text(strip=True)
-                    new_date = tds[5].get_text(strip=True) if len(tds) > 5 else ''
-                    
-                    # 個人成績から該当プレイヤーを探してディビジョンを確認
-                    # ここでは、全プレイヤーを記録し、HTMLで028のみフィルターする
-                    sl_changes.append({
-                        'player_name': player_name,
-                        'member_number': member_code,
-                        'old_sl': old_sl_text,
-                        'old_date': old_date,
-                        'new_sl': new_sl_text,
-                        'new_date': new_date
-                    })
-                except (IndexError, AttributeError):
+                # 028に属さないメンバーの行は他のセルを読む前に捨てる
+                member_code = player_link.get('href', '').split('code=')[-1]
+                if member_code not in known_members:
                     continue
+
+                player_name = player_link.get_text(strip=True)
+                old_date = tds[1].get_text(strip=True) if len(tds) > 1 else ''
+                old_sl_text = tds[2].get_text(strip=True)
+                new_sl_text = tds[4].get_text(strip=True)
+                new_date = tds[5].get_text(strip=True) if len(tds) > 5 else ''
+                
+                sl_changes.append({
+                    'player_name': player_name,
+                    'member_number': member_code,
+                    'old_sl': old_sl_text,
+                    'old_date': old_date,
+                    'new_sl': new_sl_text,
+                    'new_date': new_date
+                })
+            except (IndexError, AttributeError):
+                continue
         
-        # 028ディビジョンのプレイヤーのみをフィルター
-        # 既存の個人成績データから028のメンバーを取得
-        individual_members = set()
-        if os.path.exists(JSON_FILENAME):
-            try:
-                with open(JSON_FILENAME, 'r', encoding='utf-8') as f:
-                    existing = json.load(f)
-                    for person in existing.get('individuals', []):
-                        individual_members.add(person.get('player_number'))
-            except:
-                pass
-        
-        # 028に属するメンバーのみをフィルター
-        filtered_changes = [
-            change for change in sl_changes 
-            if change['member_number'] in individual_members
-        ]
-        
-        return filtered_changes
+        return sl_changes
     except Exception as e:
         print(f"SLレポート取得エラー: {e}")
-        return []
+        return None
 
 # --- 4. メイン処理とJSON保存 ---
+def _stored_validators(existing, key, url):
+    """前回保存したPDF（existing[key]）と同じURLなら、保存済みの ETag / Last-Modified を返す。"""
+    if not url or url != existing.get(key):
+        return {}
+    return {'etag': existing.get(f'{key}_etag'), 'last_modified': existing.get(f'{key}_last_modified')}
+
+
 def main():
     # 既存の JSON を読み込み（存在すればランキングを保持）
     existing = {}
     if os.path.exists(JSON_FILENAME):
         try:
-            with open(JSON_FILENAME, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
+            with open(JSON_FILENAME, 'rb') as f:
+                existing = orjson.loads(f.read())
         except Exception:
             existing = {}
 
-    latest_pdf_url = find_latest_pdf_url(STANDINGS_URL)
-    roster_pdf_url = find_pdf_url_by_type(STANDINGS_URL, type_char='R')
+    # スタンディングページは一度だけ取得・解析し、各タイプのPDF URLをまとめて得る
+    division_links = fetch_division_links(STANDINGS_URL)
+    latest_pdf_url = division_links['S']
+    roster_pdf_url = division_links['R']
+    # 個人成績PDF (P型) は同じ行から探したもの
+    p_pdf_url = division_links['P'] if latest_pdf_url else None
+
+    # 前回と同じスコアシートPDFなら条件付きGETで更新の有無だけを確認する。
+    # 変更がなければ (304) PDFの再ダウンロード・再解析は全て省略する。
+    # ただしP型PDFはスコアシートより後に差し替わることがあるため、前回読んだものと同じ場合に限る
+    pdf_content = None
+    source_validators = {}
+    if existing.get('individuals_pdf') == (p_pdf_url or roster_pdf_url):
+        source_validators = _stored_validators(existing, 'source_pdf', latest_pdf_url)
+    if any(source_validators.values()):
+        pdf_content = download_pdf(latest_pdf_url, **source_validators)
+    standings_unchanged = pdf_content is NOT_MODIFIED
+    fetch_standings_pdfs = bool(latest_pdf_url) and not standings_unchanged
+    # SL変動は既存の個人成績データにいる028のメンバーだけを対象にする
+    known_members = {p.get('player_number') for p in existing.get('individuals', [])}
+
+    # 名簿PDFはシーズン中ほぼ変わらないため、前回と同じURLなら条件付きGETにする
+    roster_validators = _stored_validators(existing, 'roster_pdf', roster_pdf_url)
+
+    # 各PDFとSLレポートは互いに独立しているため、同じセッションで並行して取得する
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+        roster_future = executor.submit(download_pdf, roster_pdf_url, **roster_validators) if roster_pdf_url else None
+        pdf_future = executor.submit(download_pdf, latest_pdf_url) if fetch_standings_pdfs and pdf_content is None else None
+        p_pdf_future = executor.submit(download_pdf, p_pdf_url) if fetch_standings_pdfs and p_pdf_url else None
+        # SLレポートはスコアシートPDFとは別に更新されるため、PDFが未変更 (304) でも毎回取得する
+        sl_future = executor.submit(extract_sl_changes, known_members) if latest_pdf_url else None
+    roster_pdf_content = roster_future.result() if roster_future else None
+    if pdf_future:
+        pdf_content = pdf_future.result()
+    p_pdf_content = p_pdf_future.result() if p_pdf_future else None
+    sl_changes = sl_future.result() if sl_future else None
 
     # 現在のチェック時刻（JST）
-    now_jst = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=9))).strftime('%Y年%m月%d日 %H:%M JST')
+    now_jst = datetime.datetime.now(JST).strftime('%Y年%m月%d日 %H:%M JST')
 
     # ベースとなる構造を作成（既存データを引き継ぐ）
     data_to_save = {
@@ -466,33 +571,57 @@ def main():
         'last_checked_source': latest_pdf_url or existing.get('source_pdf'),
         'last_updated': existing.get('last_updated'),
         'source_pdf': existing.get('source_pdf'),
+        'source_pdf_etag': existing.get('source_pdf_etag'),
+        'source_pdf_last_modified': existing.get('source_pdf_last_modified'),
         'individuals': existing.get('individuals', []),
         'individuals_pdf': existing.get('individuals_pdf'),
         'sl_changes': existing.get('sl_changes', []),
         'ranking': existing.get('ranking', []),
         'roster': existing.get('roster', []),
         'roster_pdf': existing.get('roster_pdf'),
+        'roster_pdf_etag': existing.get('roster_pdf_etag'),
+        'roster_pdf_last_modified': existing.get('roster_pdf_last_modified'),
     }
 
-    # 名簿PDFからチーム/メンバーを抽出
-    roster_pdf_content = download_pdf(roster_pdf_url) if roster_pdf_url else None
-    roster_entries = extract_team_roster(roster_pdf_content) if roster_pdf_content else []
-    roster_grouped = group_roster_by_team(roster_entries) if roster_entries else []
-    roster_name_map = {str(team['team_id']): team['team_name'] for team in roster_grouped}
+    # SL変動情報（取得に失敗した場合は前回の内容を保持する）
+    if sl_changes is not None:
+        data_to_save['sl_changes'] = sl_changes
+
+    # 名簿PDFからチーム/メンバーを抽出（変更がなければ前回保存した名簿を使う）
+    if roster_pdf_content is NOT_MODIFIED:
+        roster_grouped = existing.get('roster', [])
+        roster_entries = ungroup_roster(roster_grouped)
+    else:
+        roster_entries = extract_team_roster(roster_pdf_content) if roster_pdf_content else []
+        roster_grouped = group_roster_by_team(roster_entries) if roster_entries else []
+        if roster_pdf_url:
+            # 名簿が読めなかった場合は検証用ヘッダーを残さず、次回も取り直す
+            validators = PDF_VALIDATORS.get(roster_pdf_url, {}) if roster_grouped else {}
+            data_to_save['roster_pdf_etag'] = validators.get('etag')
+            data_to_save['roster_pdf_last_modified'] = validators.get('last_modified')
+    roster_name_map = {team['team_id']: team['team_name'] for team in roster_grouped}
     if roster_grouped:
         data_to_save['roster'] = roster_grouped
     if roster_pdf_url:
         data_to_save['roster_pdf'] = roster_pdf_url
 
-    if latest_pdf_url:
+    # 名簿が変わった場合はランキング・個人成績のチーム名を作り直すため、スコアシートが未変更でも解析する
+    if standings_unchanged and roster_grouped and roster_grouped != existing.get('roster'):
+        print("ℹ️ 名簿が更新されたため、スコアシートPDFと個人成績PDFを取得し直します。")
         pdf_content = download_pdf(latest_pdf_url)
-        ranking_df = extract_and_process_ranking(pdf_content)
-
-        # 個人成績PDF (P型) を同じ行から探して解析
-        p_pdf_url = find_pdf_url_by_type(STANDINGS_URL, type_char='P')
         p_pdf_content = download_pdf(p_pdf_url) if p_pdf_url else None
+        standings_unchanged = False
+
+    if standings_unchanged:
+        print("\nℹ️ スコアシートPDFに変更がないため、チェック時刻のみ更新します。")
+    elif latest_pdf_url:
+        ranked = extract_and_process_ranking(pdf_content)
+
+        # 個人成績PDF (P型) を解析
         individuals_from_roster = False
         individuals = extract_individual_stats(p_pdf_content, team_name_map=roster_name_map) if p_pdf_content else []
+        # P型PDFがあるのに個人成績が取れなかった場合は、次回も取り直す必要がある
+        individuals_complete = bool(individuals) or not p_pdf_url
 
         # 個人成績が取れない（新シーズン開始前）場合は名簿で補完する
         if not individuals and roster_entries:
@@ -510,40 +639,45 @@ def main():
 
         data_to_save['individuals'] = individuals
         data_to_save['individuals_pdf'] = p_pdf_url or roster_pdf_url or data_to_save.get('individuals_pdf')
-        
-        # SL変動情報を取得
-        sl_changes = extract_sl_changes()
-        data_to_save['sl_changes'] = sl_changes
 
         ranking_built = False
 
-        if ranking_df is not None and not ranking_df.empty:
-            # Byeチーム（ID=12）を除外
-            ranking_df = ranking_df[ranking_df['team_id'] != '12']
-            
-            # チーム名を補完。名簿のチーム名を優先し、なければ既存マップ。
-            ranking_df['team_id'] = ranking_df['team_id'].astype(str)
-            ranking_df['team_name'] = ranking_df['team_id'].map(lambda tid: roster_name_map.get(str(tid)) or TEAM_NAME_MAP.get(str(tid)) or f"チームNo.{tid}")
-
-            final_ranking = ranking_df[['team_name', 'team_id', 'points']].reset_index(drop=True)
+        if ranked:
+            # Byeチーム（ID=12）を除外し、チーム名を補完。名簿のチーム名を優先し、なければ既存マップ。
+            final_ranking = [
+                {
+                    'team_name': roster_name_map.get(row['team_id']) or TEAM_NAME_MAP.get(row['team_id'], f"チームNo.{row['team_id']}"),
+                    'team_id': row['team_id'],
+                    'points': row['points'],
+                }
+                for row in ranked if row['team_id'] != '12'
+            ]
 
+            # 304 の時は全ての処理を省略するため、個人成績とSL変動も取れた場合に限り検証用ヘッダーを保存する
+            validators = PDF_VALIDATORS.get(latest_pdf_url, {}) if individuals_complete and sl_changes is not None else {}
             data_to_save['last_updated'] = now_jst
             data_to_save['source_pdf'] = latest_pdf_url
-            data_to_save['ranking'] = final_ranking.to_dict('records')
+            data_to_save['source_pdf_etag'] = validators.get('etag')
+            data_to_save['source_pdf_last_modified'] = validators.get('last_modified')
+            data_to_save['ranking'] = final_ranking
             ranking_built = True
 
             print(f"\n✅ データは '{JSON_FILENAME}' として保存されました。")
-            print(final_ranking)
+            for row in final_ranking:
+                print(f"{row['team_name']}\t{row['team_id']}\t{row['points']}")
 
         # ランキングが取得できなかった場合は名簿ベースで0にする
         if not ranking_built and roster_grouped:
             fallback_ranking = [
-                {'team_name': team['team_name'], 'team_id': str(team['team_id'] or ''), 'points': 0}
+                {'team_name': team['team_name'], 'team_id': team['team_id'], 'points': 0}
                 for team in roster_grouped
             ]
             data_to_save['ranking'] = fallback_ranking
             data_to_save['last_updated'] = now_jst
             data_to_save['source_pdf'] = latest_pdf_url or roster_pdf_url or data_to_save.get('source_pdf')
+            # 名簿ベースの暫定ランキングなので、次回もPDFを取り直す
+            data_to_save['source_pdf_etag'] = None
+            data_to_save['source_pdf_last_modified'] = None
             ranking_built = True
             print("ℹ️ ランキングは名簿ベースで0pt表示に切り替えました（シーズン未開始想定）。")
 
@@ -556,7 +690,7 @@ def main():
         # PDFが見つからなくても名簿があればランキング・個人成績を0で生成
         if roster_grouped:
             data_to_save['ranking'] = [
-                {'team_name': team['team_name'], 'team_id': str(team['team_id'] or ''), 'points': 0}
+                {'team_name': team['team_name'], 'team_id': team['team_id'], 'points': 0}
                 for team in roster_grouped
             ]
             data_to_save['individuals'] = [{
@@ -573,8 +707,9 @@ def main():
 
     # 最後に常に JSON を保存（チェック時刻を反映）
     try:
-        with open(JSON_FILENAME, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+        # orjson は非ASCII文字をエスケープせずUTF-8のバイト列で出力する
+        with open(JSON_FILENAME, 'wb') as f:
+            f.write(orjson.dumps(data_to_save, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     except Exception as e:
         print(f"JSON の保存に失敗しました: {e}")
 